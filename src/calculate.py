@@ -1,7 +1,10 @@
 """Calculate emissions from energy usage with production-grade audit trails"""
 import json
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
 
 def load_epa_factors(filepath: str = "data/epa_factors.json") -> Dict:
     """
@@ -11,15 +14,36 @@ def load_epa_factors(filepath: str = "data/epa_factors.json") -> Dict:
         filepath: Path to EPA factors JSON file
         
     Returns:
-        dict: Complete factors data with metadata
+        dict: Complete factors data with metadata (a fresh copy the caller
+            may modify, pickle or serialize)
         
     Raises:
         FileNotFoundError: If factors file doesn't exist
         ValueError: If JSON is malformed
     """
+    return _thaw(_load_epa_factors(filepath))
+
+
+def _thaw(value):
+    """Plain dict/list copy of a frozen factors structure"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=8)
+def _load_epa_factors(filepath: str = "data/epa_factors.json") -> Mapping:
+    """
+    Parsed and validated factors, shared by every calculation in the process
+    
+    Each JSON object is frozen into a read-only MappingProxyType as it is
+    parsed, so no caller can change the factors for the rest of the process.
+    """
     try:
         with open(filepath, "r") as f:
-            factors = json.load(f)
+            factors = json.load(f, object_hook=MappingProxyType)
             
         # Validate structure
         required_keys = ["version", "data_source", "gwp_reference"]
@@ -35,11 +59,155 @@ def load_epa_factors(filepath: str = "data/epa_factors.json") -> Dict:
         raise ValueError(f"Invalid JSON in EPA factors file: {e}")
 
 
+# Inventory year stamped into every result's metadata
+INVENTORY_YEAR = 2024
+
+ELECTRICITY_METHODOLOGY_NOTE = (
+    "Location-based method using grid-average emission factors. "
+    "Market-based method would require contractual instrument tracking."
+)
+
+
+def _electricity_factor_table(factors_data: Mapping) -> Tuple[Mapping[str, float], Dict[str, str]]:
+    """
+    Flatten the electricity section of a factors file for per-bill lookups
+    
+    Returns:
+        tuple: (region -> kg CO2e/kWh, audit fields shared by every region)
+        
+    Raises:
+        ValueError: If the factors data is missing required sections
+    """
+    try:
+        return (
+            factors_data["electricity"]["factors"],
+            {
+                "emission_factor_unit": factors_data["electricity"]["unit"],
+                "emission_factor_source": factors_data["data_source"],
+                "gwp_reference": factors_data["gwp_reference"],
+                "factors_version": factors_data["version"]
+            }
+        )
+    except KeyError as e:
+        raise ValueError(f"Malformed EPA factors data structure: {e}")
+
+
+@lru_cache(maxsize=8)
+def load_electricity_factor_table(filepath: str = "data/epa_factors.json") -> Tuple[Mapping[str, float], Dict[str, str]]:
+    """
+    Region factor dict + audit fields, built once per process and path
+    
+    Every bill in a batch then costs one dict lookup for its factor. The
+    returned dicts are shared - treat them as read-only.
+    """
+    return _electricity_factor_table(_load_epa_factors(filepath))
+
+
+def _electricity_audit_head(electricity_factors: Mapping[str, float], audit_fields: Dict[str, str], region: str) -> Dict:
+    """
+    Audit fields that only depend on the region (factor + source metadata)
+    
+    Raises:
+        ValueError: If region not found
+    """
+    emission_factor = electricity_factors.get(region)
+    if emission_factor is None:
+        # AUDIT DECISION: Crash instead of defaulting to US_AVERAGE
+        # Rationale: In compliance, explicit is better than assumed
+        available_regions = ", ".join(electricity_factors.keys())
+        raise ValueError(
+            f"Region '{region}' not found in EPA factors. "
+            f"Available regions: {available_regions}"
+        )
+    return {"emission_factor": emission_factor, **audit_fields}
+
+
+@lru_cache(maxsize=64)
+def electricity_audit_template(region: str, filepath: str = "data/epa_factors.json") -> Mapping:
+    """
+    Region-level audit fields, built once per (region, path) and shared
+    
+    Every bill's audit dict starts from this template and adds its own
+    calculation_formula, so it is read-only (MappingProxyType).
+    
+    Raises:
+        ValueError: If region not found
+    """
+    return MappingProxyType(_electricity_audit_head(*load_electricity_factor_table(filepath), region))
+
+
+def _format_formula(
+    value: float, unit: str, factor_unit: str, emission_factor: float, kg_co2e: float, metric_tons_co2e: float
+) -> str:
+    """Human-readable calculation string for the audit trail"""
+    return (
+        f"{value:,.2f} {unit} × {emission_factor} kg CO2e/{factor_unit} = "
+        f"{kg_co2e:,.2f} kg CO2e = {metric_tons_co2e:.6f} metric tons CO2e"
+    )
+
+
+def _electricity_result(
+    kwh: float,
+    kg_co2e: float,
+    metric_tons_co2e: float,
+    region: str,
+    audit_template: Mapping,
+    reporting_period: Optional[str],
+    calculation_date: Optional[str],
+    include_audit: bool
+) -> Dict:
+    """
+    Result dict for one bill - shared by the single and batch calculators
+    
+    Args:
+        kwh: Kilowatt-hours the emissions were calculated from
+        kg_co2e: Unrounded kg CO2e
+        metric_tons_co2e: Unrounded metric tons CO2e
+        region: EPA eGRID subregion or US_AVERAGE
+        audit_template: Region audit fields (see electricity_audit_template)
+        reporting_period: Optional reporting period string
+        calculation_date: ISO timestamp for the metadata (default: now)
+        include_audit: False returns only the "data" section
+    """
+    data = {
+        "input_value": kwh,
+        "input_unit": "kWh",
+        "region": region,
+        "emissions_kg_co2e": round(kg_co2e, 2),
+        "emissions_mtco2e": round(metric_tons_co2e, 6)
+    }
+    if not include_audit:
+        return {"data": data}
+    
+    return {
+        "metadata": {
+            "scope": "Scope 2 (Location-based)",
+            "inventory_year": INVENTORY_YEAR,
+            "reporting_period": reporting_period or "Not specified",
+            "boundary": "Organizational",
+            "standard": "GHG Protocol Corporate Standard",
+            "calculation_date": calculation_date or datetime.now().isoformat()
+        },
+        
+        "data": data,
+        
+        "audit": {
+            **audit_template,
+            "calculation_formula": _format_formula(
+                kwh, "kWh", "kWh", audit_template["emission_factor"], kg_co2e, metric_tons_co2e
+            ),
+            "methodology_note": ELECTRICITY_METHODOLOGY_NOTE
+        }
+    }
+
+
 def calculate_electricity_emissions(
     kwh: float, 
     region: str = "US_AVERAGE",
     factors_data: Optional[Dict] = None,
-    reporting_period: Optional[str] = None
+    reporting_period: Optional[str] = None,
+    include_audit: bool = True,
+    calculation_date: Optional[str] = None
 ) -> Dict:
     """
     Calculate CO2e emissions from electricity usage with full audit trail
@@ -52,6 +220,10 @@ def calculate_electricity_emissions(
         region: EPA eGRID subregion or US_AVERAGE
         factors_data: Optional pre-loaded factors (for batch processing)
         reporting_period: Optional reporting period string (e.g., "December 2024")
+        include_audit: False returns only the "data" section (skips the
+            metadata timestamp and formula string when only totals are needed)
+        calculation_date: ISO timestamp for the metadata (default: now) - lets
+            batch callers stamp every row with one clock read
         
     Returns:
         dict: Nested structure with metadata, data, and audit trail
@@ -73,76 +245,85 @@ def calculate_electricity_emissions(
     if kwh < 0:
         raise ValueError(f"kWh cannot be negative, got {kwh}")
     
-    # === LOAD FACTORS (with caching support) ===
+    # === LOOKUP EMISSION FACTOR (audit template cached per region unless custom data is passed) ===
     if factors_data is None:
-        factors_data = load_epa_factors()
-    
-    # === LOOKUP EMISSION FACTOR ===
-    try:
-        electricity_factors = factors_data["electricity"]["factors"]
-        
-        if region not in electricity_factors:
-            # AUDIT DECISION: Crash instead of defaulting to US_AVERAGE
-            # Rationale: In compliance, explicit is better than assumed
-            available_regions = ", ".join(electricity_factors.keys())
-            raise ValueError(
-                f"Region '{region}' not found in EPA factors. "
-                f"Available regions: {available_regions}"
-            )
-        
-        emission_factor = electricity_factors[region]
-        
-    except KeyError as e:
-        raise ValueError(f"Malformed EPA factors data structure: {e}")
+        audit_template = electricity_audit_template(region)
+    else:
+        audit_template = _electricity_audit_head(*_electricity_factor_table(factors_data), region)
+    emission_factor = audit_template["emission_factor"]
     
     # === CALCULATE EMISSIONS ===
     kg_co2e = kwh * emission_factor
     metric_tons_co2e = kg_co2e / 1000
     
-    # === BUILD CALCULATION STRING ===
-    calculation_formula = (
-        f"{kwh:,.2f} kWh × {emission_factor} kg CO2e/kWh = "
-        f"{kg_co2e:,.2f} kg CO2e = {metric_tons_co2e:.6f} metric tons CO2e"
+    # === RETURN ENRICHED STRUCTURE ===
+    return _electricity_result(
+        kwh, kg_co2e, metric_tons_co2e, region, audit_template,
+        reporting_period, calculation_date, include_audit
     )
+
+
+def calculate_electricity_emissions_batch(
+    kwh_values: Sequence[float],
+    region: str = "US_AVERAGE",
+    reporting_periods: Optional[Sequence[Optional[str]]] = None,
+    include_audit: bool = True,
+    calculation_date: Optional[str] = None
+) -> List[Dict]:
+    """
+    calculate_electricity_emissions for many bills in one region at once
     
-    # === RETURN ENRICHED STRUCTURE ===
-    return {
-        "metadata": {
-            "scope": "Scope 2 (Location-based)",
-            "inventory_year": 2024,
-            "reporting_period": reporting_period or "Not specified",
-            "boundary": "Organizational",
-            "standard": "GHG Protocol Corporate Standard",
-            "calculation_date": datetime.now().isoformat()
-        },
+    The factor is looked up once and applied to every bill with one NumPy
+    multiply; each result has the same shape (and values) as the
+    single-bill function.
+    
+    Args:
+        kwh_values: Kilowatt-hours per bill (must be non-negative)
+        region: EPA eGRID subregion or US_AVERAGE, shared by all bills
+        reporting_periods: Optional reporting period string per bill
+        include_audit: False returns only the "data" section per bill
+        calculation_date: ISO timestamp for the metadata (default: now)
         
-        "data": {
-            "input_value": kwh,
-            "input_unit": "kWh",
-            "region": region,
-            "emissions_kg_co2e": round(kg_co2e, 2),
-            "emissions_mtco2e": round(metric_tons_co2e, 6)
-        },
+    Returns:
+        list: One result dict per bill, in input order
         
-        "audit": {
-            "emission_factor": emission_factor,
-            "emission_factor_unit": factors_data["electricity"]["unit"],
-            "emission_factor_source": factors_data["data_source"],
-            "gwp_reference": factors_data["gwp_reference"],
-            "factors_version": factors_data["version"],
-            "calculation_formula": calculation_formula,
-            "methodology_note": (
-                "Location-based method using grid-average emission factors. "
-                "Market-based method would require contractual instrument tracking."
-            )
-        }
-    }
+    Raises:
+        ValueError: If any kWh value is negative or region not found
+    """
+    kwh_arr = np.asarray(kwh_values, dtype=np.float64)
+    if (kwh_arr < 0).any():
+        raise ValueError(f"kWh cannot be negative, got {kwh_arr.min()}")
+    
+    audit_template = electricity_audit_template(region)
+    emission_factor = audit_template["emission_factor"]
+    
+    # === CALCULATE EMISSIONS (whole batch) ===
+    kg_arr = kwh_arr * emission_factor
+    mt_arr = kg_arr / 1000
+    
+    # One clock read for the whole batch
+    if include_audit:
+        calculation_date = calculation_date or datetime.now().isoformat()
+    if reporting_periods is None:
+        reporting_periods = [None] * len(kwh_arr)
+    
+    return [
+        _electricity_result(
+            kwh, kg_co2e, metric_tons_co2e, region, audit_template,
+            reporting_period, calculation_date, include_audit
+        )
+        for kwh, kg_co2e, metric_tons_co2e, reporting_period in zip(
+            kwh_values, kg_arr.tolist(), mt_arr.tolist(), reporting_periods
+        )
+    ]
 
 
 def calculate_natural_gas_emissions(
     therms: float,
     factors_data: Optional[Dict] = None,
-    reporting_period: Optional[str] = None
+    reporting_period: Optional[str] = None,
+    include_audit: bool = True,
+    calculation_date: Optional[str] = None
 ) -> Dict:
     """
     Calculate CO2e emissions from natural gas combustion (Scope 1)
@@ -151,6 +332,8 @@ def calculate_natural_gas_emissions(
         therms: Natural gas consumption in therms
         factors_data: Optional pre-loaded factors
         reporting_period: Optional reporting period string
+        include_audit: False returns only the "data" section
+        calculation_date: ISO timestamp for the metadata (default: now)
         
     Returns:
         dict: Nested structure with metadata, data, and audit trail
@@ -165,7 +348,7 @@ def calculate_natural_gas_emissions(
     
     # Load factors
     if factors_data is None:
-        factors_data = load_epa_factors()
+        factors_data = _load_epa_factors()
     
     # Lookup factor
     try:
@@ -177,27 +360,26 @@ def calculate_natural_gas_emissions(
     kg_co2e = therms * emission_factor
     metric_tons_co2e = kg_co2e / 1000
     
-    calculation_formula = (
-        f"{therms:,.2f} therms × {emission_factor} kg CO2e/therm = "
-        f"{kg_co2e:,.2f} kg CO2e = {metric_tons_co2e:.6f} metric tons CO2e"
-    )
+    data = {
+        "input_value": therms,
+        "input_unit": "therms",
+        "emissions_kg_co2e": round(kg_co2e, 2),
+        "emissions_mtco2e": round(metric_tons_co2e, 6)
+    }
+    if not include_audit:
+        return {"data": data}
     
     return {
         "metadata": {
             "scope": "Scope 1 (Direct)",
-            "inventory_year": 2024,
+            "inventory_year": INVENTORY_YEAR,
             "reporting_period": reporting_period or "Not specified",
             "boundary": "Organizational",
             "standard": "GHG Protocol Corporate Standard",
-            "calculation_date": datetime.now().isoformat()
+            "calculation_date": calculation_date or datetime.now().isoformat()
         },
         
-        "data": {
-            "input_value": therms,
-            "input_unit": "therms",
-            "emissions_kg_co2e": round(kg_co2e, 2),
-            "emissions_mtco2e": round(metric_tons_co2e, 6)
-        },
+        "data": data,
         
         "audit": {
             "emission_factor": emission_factor,
@@ -205,7 +387,9 @@ def calculate_natural_gas_emissions(
             "emission_factor_source": factors_data["data_source"],
             "gwp_reference": factors_data["gwp_reference"],
             "factors_version": factors_data["version"],
-            "calculation_formula": calculation_formula,
+            "calculation_formula": _format_formula(
+                therms, "therms", "therm", emission_factor, kg_co2e, metric_tons_co2e
+            ),
             "methodology_note": (
                 "Direct combustion emission factor for natural gas. "
                 "Includes CO2, CH4, and N2O in CO2e using AR5 GWPs."
@@ -218,12 +402,99 @@ def calculate_natural_gas_emissions(
 # BATCH PROCESSING HELPER (For efficiency when processing many bills)
 # ============================================================================
 
-def batch_calculate_emissions(activities: list) -> Tuple[list, Dict]:
+def _validate_activity(activity: Dict, factors_data: Mapping) -> Tuple[str, float, Optional[str]]:
+    """
+    Check one batch activity before anything is calculated
+    
+    Returns:
+        tuple: (activity type, value, region - None for natural gas)
+        
+    Raises:
+        The same TypeError/ValueError/KeyError the calculators would raise
+    """
+    activity_type = activity["type"]
+    
+    if activity_type == "electricity":
+        kwh = activity["value"]
+        if not isinstance(kwh, (int, float)):
+            raise TypeError(f"kWh must be numeric, got {type(kwh).__name__}")
+        if kwh < 0:
+            raise ValueError(f"kWh cannot be negative, got {kwh}")
+        region = activity.get("region", "US_AVERAGE")
+        electricity_audit_template(region)  # raises for unknown regions (and caches the template)
+        return activity_type, kwh, region
+    
+    if activity_type == "natural_gas":
+        therms = activity["value"]
+        if not isinstance(therms, (int, float)):
+            raise TypeError(f"Therms must be numeric, got {type(therms).__name__}")
+        if therms < 0:
+            raise ValueError(f"Therms cannot be negative, got {therms}")
+        try:
+            factors_data["natural_gas"]["factors"]["US_AVERAGE"]
+        except KeyError as e:
+            raise ValueError(f"Natural gas factors not found: {e}")
+        return activity_type, therms, None
+    
+    raise ValueError(f"Unknown activity type: {activity_type}")
+
+
+def _validate_activities(activities: list, factors_data: Mapping) -> Tuple[List[Tuple], Dict[int, Dict]]:
+    """
+    Split batch activities into calculable rows and per-index errors
+    
+    Returns:
+        tuple: ([(index, type, value, region), ...], {index: error dict})
+    """
+    valid = []
+    errors = {}
+    for i, activity in enumerate(activities):
+        try:
+            valid.append((i, *_validate_activity(activity, factors_data)))
+        except Exception as e:
+            errors[i] = {"activity_index": i, "error": str(e)}
+    return valid, errors
+
+
+def _total_emissions_mtco2e(valid: List[Tuple], factors_data: Mapping) -> float:
+    """
+    Summary total for validated batch rows from data-only results
+    
+    The calculators run with include_audit=False (electricity grouped by
+    region), skipping metadata, audit and formula strings; their rounded
+    emissions_mtco2e are summed in input order, so the total matches the
+    full results.
+    """
+    emissions_by_index = {}
+    electricity_by_region = {}  # region -> [(index, kwh), ...]
+    for i, activity_type, value, region in valid:
+        if activity_type == "electricity":
+            electricity_by_region.setdefault(region, []).append((i, value))
+        else:
+            result = calculate_natural_gas_emissions(value, factors_data, include_audit=False)
+            emissions_by_index[i] = result["data"]["emissions_mtco2e"]
+    
+    for region, rows in electricity_by_region.items():
+        region_results = calculate_electricity_emissions_batch([kwh for _, kwh in rows], region, include_audit=False)
+        emissions_by_index.update(
+            (i, result["data"]["emissions_mtco2e"]) for (i, _), result in zip(rows, region_results)
+        )
+    
+    return sum(emissions_by_index[i] for i in sorted(emissions_by_index))
+
+
+def batch_calculate_emissions(
+    activities: list,
+    *,
+    return_full: bool = True
+) -> Tuple[list, Dict]:
     """
     Calculate emissions for multiple activities efficiently
     
     Args:
         activities: List of dicts with keys: type, value, region (optional)
+        return_full: False skips the per-activity results entirely and
+            returns an empty results list - only the summary is computed
         
     Returns:
         tuple: (list of results, summary dict)
@@ -235,34 +506,45 @@ def batch_calculate_emissions(activities: list) -> Tuple[list, Dict]:
             {"type": "natural_gas", "value": 45}
         ]
     """
-    # Load factors once for all calculations
-    factors_data = load_epa_factors()
+    # Load factors and read the clock once for all calculations
+    factors_data = _load_epa_factors()
+    calculation_date = datetime.now().isoformat()
     
-    results = []
-    total_emissions = 0.0
-    errors = []
+    # === VALIDATION PASS (all rejects are collected here) ===
+    valid, errors_by_index = _validate_activities(activities, factors_data)
     
-    for i, activity in enumerate(activities):
-        try:
-            if activity["type"] == "electricity":
-                result = calculate_electricity_emissions(
-                    activity["value"],
-                    activity.get("region", "US_AVERAGE"),
-                    factors_data
-                )
-            elif activity["type"] == "natural_gas":
-                result = calculate_natural_gas_emissions(
-                    activity["value"],
-                    factors_data
-                )
-            else:
-                raise ValueError(f"Unknown activity type: {activity['type']}")
-            
-            results.append(result)
-            total_emissions += result["data"]["emissions_mtco2e"]
-            
-        except Exception as e:
-            errors.append({"activity_index": i, "error": str(e)})
+    errors = [errors_by_index[i] for i in sorted(errors_by_index)]
+    if not return_full:
+        return [], {
+            "total_emissions_mtco2e": round(_total_emissions_mtco2e(valid, factors_data), 6),
+            "activities_processed": len(valid),
+            "activities_failed": len(errors),
+            "errors": errors
+        }
+    
+    # === CALCULATION PASS (validated activities only) ===
+    results_by_index = {}
+    electricity_by_region = {}  # region -> [(index, kwh), ...]
+    for i, activity_type, value, region in valid:
+        if activity_type == "electricity":
+            electricity_by_region.setdefault(region, []).append((i, value))
+        else:
+            results_by_index[i] = calculate_natural_gas_emissions(
+                value,
+                factors_data,
+                calculation_date=calculation_date
+            )
+    
+    # Electricity: one vectorized calculation per region
+    for region, rows in electricity_by_region.items():
+        region_results = calculate_electricity_emissions_batch(
+            [kwh for _, kwh in rows], region, calculation_date=calculation_date
+        )
+        results_by_index.update(zip((i for i, _ in rows), region_results))
+    
+    # Input order, as if each activity had been calculated in turn
+    results = [results_by_index[i] for i in sorted(results_by_index)]
+    total_emissions = sum(result["data"]["emissions_mtco2e"] for result in results)
     
     summary = {
         "total_emissions_mtco2e": round(total_emissions, 6),
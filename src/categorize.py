@@ -1,27 +1,21 @@
 # ESG categorization
 """Categorize activities to ESG frameworks"""
-from src.utils import call_claude_with_cost
+from src.utils import calculate_claude_cost, call_claude_with_cost, run_message_batch
 import json
+import os
+import re
 
-def categorize_to_scope(activity_description):
-    """
-    Categorize activity to GHG Protocol Scope (1, 2, or 3)
-    
-    Args:
-        activity_description: Description of the activity
-        
-    Returns:
-        dict: Scope category and reasoning
-    """
-    # Validate input
-    if not activity_description or not activity_description.strip():
-        return {
-            "scope": "Unknown",
-            "reasoning": "No activity description provided",
-            "categorization_cost": 0
-        }
-    
-    prompt = f"""Categorize this activity according to GHG Protocol scopes.
+# Scope classification is a short 4-way label - Haiku handles it at a fraction
+# of Sonnet's latency and price. Set ESG_CATEGORIZE_MODEL to override
+# (e.g. claude-sonnet-4-20250514).
+CATEGORIZE_MODEL = os.getenv("ESG_CATEGORIZE_MODEL", "claude-haiku-4-5-20251001")
+
+# Leading ```json / ``` and trailing ``` markdown fences around a JSON answer
+_FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
+def build_scope_prompt(activity_description):
+    """Prompt asking Claude for a GHG Protocol scope as JSON"""
+    return f"""Categorize this activity according to GHG Protocol scopes.
 
 Activity: {activity_description}
 
@@ -41,22 +35,25 @@ Return a JSON object with:
 
 Return ONLY valid JSON, no markdown formatting."""
 
-    response, cost = call_claude_with_cost(prompt, max_tokens=256, temperature=0)
+
+def parse_scope_response(response, categorization_cost):
+    """
+    Parse Claude's JSON scope answer
     
-    # Strip markdown fences if present
-    response = response.strip()
-    if response.startswith("```json"):
-        response = response[7:]
-    if response.startswith("```"):
-        response = response[3:]
-    if response.endswith("```"):
-        response = response[:-3]
-    response = response.strip()
+    Args:
+        response: Raw response text
+        categorization_cost: API cost of the call that produced it
+        
+    Returns:
+        dict: Scope category, reasoning and categorization_cost
+    """
+    # Strip markdown fences if present (one regex pass)
+    response = _FENCE_RE.sub('', response).strip()
     
     # Parse JSON
     try:
         data = json.loads(response)
-        data['categorization_cost'] = cost['total_cost']
+        data['categorization_cost'] = categorization_cost
         
         # Validate scope value
         valid_scopes = ["Scope 1", "Scope 2", "Scope 3", "Unknown"]
@@ -72,9 +69,93 @@ Return ONLY valid JSON, no markdown formatting."""
         return {
             "scope": "Unknown",
             "reasoning": "Failed to parse response",
-            "categorization_cost": cost['total_cost']
+            "categorization_cost": categorization_cost
         }
 
+
+def categorize_to_scope(activity_description, model=CATEGORIZE_MODEL):
+    """
+    Categorize activity to GHG Protocol Scope (1, 2, or 3)
+    
+    Args:
+        activity_description: Description of the activity
+        model: Claude model used for classification (default: CATEGORIZE_MODEL)
+        
+    Returns:
+        dict: Scope category and reasoning
+    """
+    # Validate input
+    if not activity_description or not activity_description.strip():
+        return {
+            "scope": "Unknown",
+            "reasoning": "No activity description provided",
+            "categorization_cost": 0
+        }
+    
+    response, cost = call_claude_with_cost(
+        build_scope_prompt(activity_description), max_tokens=256, model=model, temperature=0
+    )
+    return parse_scope_response(response, cost['total_cost'])
+
+
+def categorize_batch(activities, model=CATEGORIZE_MODEL, poll_interval=5.0):
+    """
+    Categorize many activities in one Message Batches job
+    
+    Half the per-token price of categorize_to_scope and one submission
+    instead of N serial round-trips - use it for uploaded activity lists,
+    not single lookups (the job takes at least one poll interval).
+    
+    Args:
+        activities: List of activity descriptions
+        model: Claude model used for classification (default: CATEGORIZE_MODEL)
+        poll_interval: Seconds between batch status checks
+        
+    Returns:
+        list: One categorize_to_scope-shaped dict per activity, in input order
+    """
+    results = [None] * len(activities)
+    requests = {}
+    for index, activity in enumerate(activities):
+        if not activity or not activity.strip():
+            results[index] = {
+                "scope": "Unknown",
+                "reasoning": "No activity description provided",
+                "categorization_cost": 0
+            }
+            continue
+        requests[f"act-{index}"] = {
+            "model": model,
+            "max_tokens": 256,
+            "temperature": 0,
+            "messages": [{"role": "user", "content": build_scope_prompt(activity)}]
+        }
+    
+    if not requests:
+        return results
+    
+    try:
+        messages = run_message_batch(requests, poll_interval=poll_interval)
+    except Exception as e:
+        print(f"❌ Categorization batch failed: {e}")
+        messages = dict.fromkeys(requests)
+    
+    for custom_id, message in messages.items():
+        index = int(custom_id.split("-", 1)[1])
+        if message is None:
+            results[index] = {
+                "scope": "Unknown",
+                "reasoning": "Batch request errored or expired",
+                "categorization_cost": 0
+            }
+            continue
+        cost = calculate_claude_cost(
+            message.usage.input_tokens, message.usage.output_tokens, batch=True, model=model
+        )
+        results[index] = parse_scope_response(message.content[0].text, cost)
+    
+    return results
+
 # Test it
 if __name__ == "__main__":
     test_cases = [
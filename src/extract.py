@@ -2,6 +2,7 @@
 Extract data from utility bills using production-grade 3-tier strategy
 
 EXTRACTION STRATEGY:
+- Tier 0: pypdfium2 text layer probe (typed PDFs) - skips Docling/OCR - $0/bill
 - Tier 1: Docling (local processing) - 85% of bills - $0/bill
 - Tier 2: Tesseract OCR (local processing) - 10% of bills - $0/bill
 - Tier 3: Claude Vision API (cloud API) - 5% of bills - ~$0.01-0.02/bill
@@ -19,23 +20,73 @@ KEY FEATURES:
 - Complete cost tracking per extraction
 """
 import json
+import os
 import re
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
 from datetime import datetime
-from src.utils import call_claude_with_cost, extract_from_pdf_with_ai
+from src.utils import (
+    build_message_params,
+    calculate_claude_cost,
+    call_claude_with_cost,
+    extract_from_pdf_with_ai,
+    extract_labeled_usage,
+    message_text,
+    parse_bill_text,
+    parse_json_object,
+    read_pdf_bytes,
+    run_message_batch,
+    score_extraction,
+)
 
-def extract_utility_bill_data(bill_text):
-    """
-    Extract structured data from utility bill text with validation
-    
-    Args:
-        bill_text: Raw text from utility bill
-        
-    Returns:
-        dict: Extracted data (kwh, cost, dates, etc.) or None if failed
-    """
-    
-    # === ENHANCED PROMPT ===
-    prompt = f"""Extract the following information from this utility bill and return as valid JSON:
+# On-disk memoization of PDF extractions (keyed by SHA-256 of the PDF bytes)
+EXTRACTION_CACHE_DIR = Path(".cache/extract")
+
+# Extraction method -> canonical tier key ("docling", "ocr", "claude").
+# The Tier 0 text-layer probe is local and free, so it is counted with Docling.
+_TIER_RE = re.compile(r"(Text layer|Docling|OCR|Claude|Vision)")
+_TIER_KEYS = {
+    "Text layer": "docling",
+    "Docling": "docling",
+    "OCR": "ocr",
+    "Claude": "claude",
+    "Vision": "claude"
+}
+
+
+def extraction_tier(method):
+    """Canonical tier key for an extraction method string, or None if unrecognized"""
+    tier_match = _TIER_RE.search(method or "")
+    return _TIER_KEYS[tier_match.group(1)] if tier_match else None
+
+# Well-formatted bill text parsed by the local regex extractors at or above
+# this confidence (and passing validation) never goes to Claude. The score
+# only counts which fields were found, so the fast path also requires the
+# usage to come from an explicit total label (see extract_labeled_usage).
+TEXT_REGEX_MIN_CONFIDENCE = 0.85
+
+# Text extraction tries Haiku first (a fraction of Sonnet's price and latency);
+# answers that do not parse or fail validation are retried once on the
+# fallback model. Set ESG_EXTRACTION_MODEL to override the first model.
+BILL_EXTRACTION_MODEL = os.getenv("ESG_EXTRACTION_MODEL", "claude-haiku-4-5-20251001")
+BILL_EXTRACTION_FALLBACK_MODEL = "claude-sonnet-4-20250514"
+
+# The extraction object is flat, so its first "}" closes it - stopping there
+# server-side drops any trailing commentary without paying for those tokens
+BILL_EXTRACTION_STOP_SEQUENCES = ("}",)
+
+# The six-field object is ~100 tokens; the cap only bounds a runaway answer
+BILL_EXTRACTION_MAX_TOKENS = 256
+
+# Bill-independent extraction instructions - sent as the system prompt so
+# only the bill text varies between calls. Not marked for prompt caching:
+# at a few hundred tokens it is below the minimum cacheable prefix (1024
+# tokens for Sonnet, 4096 for Haiku 4.5), so the API would ignore it.
+BILL_EXTRACTION_SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": """Extract the following information from the utility bill in the user message and return as valid JSON:
 
 Required fields:
 - account_number (string)
@@ -45,9 +96,6 @@ Required fields:
 - usage_unit (string - "kWh", "MWh", "therms", etc.)
 - total_cost (number - dollars, no $ symbol)
 
-Utility Bill:
-{bill_text}
-
 CRITICAL INSTRUCTIONS:
 1. For total_usage, extract the CURRENT BILLING PERIOD usage, NOT:
    - Average monthly usage
@@ -56,31 +104,202 @@ CRITICAL INSTRUCTIONS:
 2. Look for terms like "Billed Usage", "Current Usage", "Usage for this period"
 3. Return ONLY the raw JSON object with no markdown formatting, no backticks, no explanatory text
 4. If a field is not found, use null"""
+    }
+]
 
-    try:
-        response, cost = call_claude_with_cost(prompt, max_tokens=512, temperature=0)
-        
-        # === JSON CLEANING WITH REGEX ===
-        json_match = re.search(r'\{.*\}', response, re.DOTALL)
-        if not json_match:
-            print(f"Warning: No JSON object found in response: {response[:200]}")
-            return None
-        
-        json_str = json_match.group()
-        
-        # Parse JSON
-        data = json.loads(json_str)
+
+def extract_utility_bill_data(bill_text, no_cache=False, cache_dir=EXTRACTION_CACHE_DIR):
+    """
+    Extract structured data from utility bill text with validation
+    
+    Bills the local regex extractors parse confidently are answered for $0
+    without an API call. Claude extractions that pass validation are stored
+    on disk keyed by the models, the instructions and the bill text, so
+    identical text is never sent to Claude twice (temperature is 0, so the
+    answer would be the same). Answers that fail validation are retried.
+    
+    Args:
+        bill_text: Raw text from utility bill
+        no_cache: Skip the cache lookup (a fresh validated result is still stored)
+        cache_dir: Directory holding cached extractions
         
-        # Process and validate the extracted data
-        return _process_extracted_data(data, cost['total_cost'], 'Text extraction')
+    Returns:
+        dict: Extracted data (kwh, cost, dates, etc.) or None if failed
+    """
+    extracted = _extract_bill_text_locally(bill_text)
+    if extracted:
+        return extracted
+    
+    cache_path = _text_extraction_cache_path(bill_text, cache_dir)
+    if not no_cache:
+        cached = _read_cache_entry(cache_path)
+        if cached:
+            return cached
+    
+    extracted = _extract_utility_bill_data_uncached(bill_text)
+    if extracted and extracted['validation_passed']:
+        _write_cache_entry(cache_path, extracted)
+    return extracted
+
+
+def _extract_bill_text_locally(bill_text):
+    """Regex fast path - the same field extractors as the local PDF tiers (None if not confident)"""
+    # Without a labeled total, the usage fallbacks may pick any kWh figure
+    # (e.g. a "Peak: 320 kWh" breakdown line) - leave those bills to Claude
+    labeled_usage = extract_labeled_usage(bill_text)
+    if labeled_usage is None:
+        return None
+    
+    data = parse_bill_text(bill_text)
+    data["total_usage"] = labeled_usage
+    confidence, is_valid, _ = score_extraction(data)
+    if confidence < TEXT_REGEX_MIN_CONFIDENCE or not is_valid:
+        return None
+    
+    print(f"✓ Text parsed locally ({confidence:.0%} confidence) - skipping Claude")
+    return _process_extracted_data(data, 0.0, 'Text extraction (local regex)')
+
+
+def _text_extraction_cache_path(bill_text, cache_dir):
+    """Cache file for bill text - models and instructions are hashed in so changing either invalidates entries"""
+    digest = hashlib.sha256()
+    digest.update("\0".join(_bill_extraction_models()).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(BILL_EXTRACTION_SYSTEM_BLOCKS[0]["text"].encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(bill_text.encode("utf-8"))
+    return Path(cache_dir) / f"text-{digest.hexdigest()}.json"
+
+
+def _bill_extraction_models():
+    """Models to try in order (the fallback is skipped if it is also the first model)"""
+    return list(dict.fromkeys((BILL_EXTRACTION_MODEL, BILL_EXTRACTION_FALLBACK_MODEL)))
+
+
+def _extract_utility_bill_data_uncached(bill_text):
+    """Claude calls for extract_utility_bill_data - escalates to the fallback model if needed"""
+    prompt = f"Utility Bill:\n{bill_text}"
+    extracted = None
+    total_cost = 0.0
+
+    for model in _bill_extraction_models():
+        try:
+            response, cost = call_claude_with_cost(
+                prompt,
+                max_tokens=BILL_EXTRACTION_MAX_TOKENS,
+                model=model,
+                temperature=0,
+                system_blocks=BILL_EXTRACTION_SYSTEM_BLOCKS,
+                stop_sequences=BILL_EXTRACTION_STOP_SEQUENCES
+            )
+        except Exception as e:
+            print(f"Extraction error ({model}): {e}")
+            continue
         
+        total_cost += cost['total_cost']
+        extracted = _parse_bill_response(response, total_cost, model) or extracted
+        if extracted and extracted['validation_passed']:
+            break
+        print(f"⚠️ {model} answer did not parse or validate")
+    
+    if extracted:
+        extracted['extraction_cost'] = total_cost
+    return extracted
+
+
+def _parse_bill_response(response, extraction_cost, model):
+    """Pull the JSON object out of a text-extraction answer and validate it (None on failure)"""
+    try:
+        data = parse_json_object(response)
     except json.JSONDecodeError as e:
         print(f"JSON parsing error: {e}")
         print(f"Response was: {response[:500]}")
         return None
-    except Exception as e:
-        print(f"Extraction error: {e}")
+    
+    if data is None:
+        print(f"Warning: No JSON object found in response: {response[:200]}")
         return None
+    
+    # Process and validate the extracted data
+    extracted = _process_extracted_data(data, extraction_cost, 'Text extraction')
+    if extracted:
+        extracted['model_used'] = model
+    return extracted
+
+
+def extract_utility_bill_data_batch(bill_texts, poll_interval=5.0, cache_dir=EXTRACTION_CACHE_DIR):
+    """
+    Extract many bill texts in one Message Batches job
+    
+    Texts the regex fast path handles or that are cached are answered
+    locally; the rest go out as a single batch
+    (half price, one submission instead of N round-trips) sharing the
+    same instructions. Answers that do not validate are sent
+    again as a second batch on the fallback model. Use it for bulk
+    ingestion - each job takes at least one poll interval.
+    
+    Args:
+        bill_texts: List of raw bill texts
+        poll_interval: Seconds between batch status checks
+        cache_dir: Directory holding cached extractions
+        
+    Returns:
+        list: One extract_utility_bill_data-shaped dict (or None) per text, in input order
+    """
+    results = [None] * len(bill_texts)
+    cache_paths = {}
+    for index, bill_text in enumerate(bill_texts):
+        cache_path = _text_extraction_cache_path(bill_text, cache_dir)
+        local = _extract_bill_text_locally(bill_text) or _read_cache_entry(cache_path)
+        if local:
+            results[index] = local
+        else:
+            cache_paths[index] = cache_path
+    
+    pending = list(cache_paths)
+    costs = dict.fromkeys(pending, 0.0)
+    for model in _bill_extraction_models():
+        if not pending:
+            break
+        requests = {
+            f"bill-{index}": build_message_params(
+                f"Utility Bill:\n{bill_texts[index]}", BILL_EXTRACTION_MAX_TOKENS, model, None, 0,
+                BILL_EXTRACTION_SYSTEM_BLOCKS, BILL_EXTRACTION_STOP_SEQUENCES
+            )
+            for index in pending
+        }
+        try:
+            messages = run_message_batch(requests, poll_interval=poll_interval)
+        except Exception as e:
+            print(f"❌ Text extraction batch failed ({model}): {e}")
+            break
+        
+        pending = []
+        for custom_id, message in messages.items():
+            index = int(custom_id.split("-", 1)[1])
+            if message is None:
+                pending.append(index)
+                continue
+            usage = message.usage
+            costs[index] += calculate_claude_cost(
+                usage.input_tokens,
+                usage.output_tokens,
+                batch=True,
+                cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+                cache_read_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+                model=model
+            )
+            results[index] = _parse_bill_response(message_text(message), costs[index], model) or results[index]
+            if not (results[index] and results[index]['validation_passed']):
+                pending.append(index)
+    
+    for index, cache_path in cache_paths.items():
+        if results[index]:
+            results[index]['extraction_cost'] = costs[index]
+            if results[index]['validation_passed']:
+                _write_cache_entry(cache_path, results[index])
+    
+    return results
 
 
 def extract_from_pdf_hybrid(pdf_file, confidence_threshold=0.85, enable_ocr=True):
@@ -97,7 +316,7 @@ def extract_from_pdf_hybrid(pdf_file, confidence_threshold=0.85, enable_ocr=True
     - Claude-only: $10-20/month
     
     Args:
-        pdf_file: Streamlit UploadedFile object
+        pdf_file: PDF bytes or file-like object (e.g. Streamlit UploadedFile)
         confidence_threshold: Minimum confidence to accept result (default: 0.85)
         enable_ocr: Whether to use OCR tier (default: True)
         
@@ -114,6 +333,19 @@ def extract_from_pdf_hybrid(pdf_file, confidence_threshold=0.85, enable_ocr=True
         enable_ai=True  # Always enable Claude API fallback
     )
     
+    return finalize_hybrid_result(result)
+
+
+def finalize_hybrid_result(result):
+    """
+    Validate and process a raw 3-tier result (shared by sync and async paths)
+    
+    Args:
+        result: dict returned by extract_bill_data
+        
+    Returns:
+        dict: Processed extraction data with metadata, or None if unusable
+    """
     # Check if extraction succeeded
     if not result.get("success"):
         print(f"❌ All extraction tiers failed")
@@ -155,6 +387,7 @@ def extract_from_pdf_hybrid(pdf_file, confidence_threshold=0.85, enable_ocr=True
     
     # Add 3-tier metadata
     if processed:
+        processed['tier'] = extraction_tier(method)
         processed['tiers_used'] = tiers_used
         processed['extraction_confidence'] = confidence
         processed['validation_issues'] = result.get('validation_issues', [])
@@ -162,12 +395,90 @@ def extract_from_pdf_hybrid(pdf_file, confidence_threshold=0.85, enable_ocr=True
     return processed
 
 
+def extract_from_pdf_cached(pdf_file, confidence_threshold=0.85, cache_dir=EXTRACTION_CACHE_DIR):
+    """
+    Disk-memoized wrapper around extract_from_pdf_hybrid
+    
+    The PDF bytes are hashed (SHA-256) and the processed extraction is stored
+    as JSON under cache_dir. Re-processing an identical bill is a single file
+    read - no Docling/OCR run and no Claude API call.
+    
+    Args:
+        pdf_file: PDF bytes or file-like object (e.g. Streamlit UploadedFile)
+        confidence_threshold: Minimum confidence to accept result (default: 0.85)
+        cache_dir: Directory holding cached extractions
+        
+    Returns:
+        dict: Processed extraction data (extraction_cost is 0 on a cache hit)
+              or None if extraction failed
+    """
+    pdf_bytes = read_pdf_bytes(pdf_file)
+    
+    cached = load_cached_extraction(pdf_bytes, confidence_threshold, cache_dir)
+    if cached:
+        return cached
+    
+    extracted = extract_from_pdf_hybrid(pdf_bytes, confidence_threshold=confidence_threshold)
+    save_cached_extraction(pdf_bytes, confidence_threshold, extracted, cache_dir)
+    
+    return extracted
+
+
+def _extraction_cache_path(pdf_bytes, confidence_threshold, cache_dir):
+    """Cache file for a bill - threshold is part of the key since it can pick a different tier"""
+    key = hashlib.sha256(pdf_bytes).hexdigest()
+    return Path(cache_dir) / f"{key}-{confidence_threshold:.2f}.json"
+
+
+def load_cached_extraction(pdf_bytes, confidence_threshold=0.85, cache_dir=EXTRACTION_CACHE_DIR):
+    """
+    Look up a previously stored extraction for these PDF bytes
+    
+    Returns:
+        dict: Cached extraction (extraction_cost 0, cache_hit True) or None on a miss
+    """
+    return _read_cache_entry(_extraction_cache_path(pdf_bytes, confidence_threshold, cache_dir))
+
+
+def _read_cache_entry(cache_path):
+    """Load one cached extraction, marked as free; None on a miss or unreadable file"""
+    if cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text())
+            cached['extraction_cost'] = 0.0  # Nothing was spent this time
+            cached['cache_hit'] = True
+            cached.setdefault('tier', extraction_tier(cached.get('extraction_method')))  # entries written before 'tier' existed
+            print(f"♻️ Extraction cache hit: {cache_path.stem[:12]}")
+            return cached
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable cache entry {cache_path}: {e}")
+    
+    return None
+
+
+def save_cached_extraction(pdf_bytes, confidence_threshold, extracted, cache_dir=EXTRACTION_CACHE_DIR):
+    """Store an extraction result - only successful extractions are cached so failures get retried"""
+    if not extracted:
+        return
+    
+    _write_cache_entry(_extraction_cache_path(pdf_bytes, confidence_threshold, cache_dir), extracted)
+
+
+def _write_cache_entry(cache_path, extracted):
+    """Write one extraction as JSON - cache failures are logged, never raised"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps(extracted))
+    except (OSError, TypeError) as e:
+        print(f"⚠️ Could not write extraction cache: {e}")
+
+
 def extract_from_pdf(pdf_file):
     """
     Extract utility bill data directly from PDF using AI
     
     Args:
-        pdf_file: Streamlit UploadedFile object
+        pdf_file: PDF bytes or file-like object (e.g. Streamlit UploadedFile)
         
     Returns:
         dict: Extracted data or None if failed
@@ -185,6 +496,34 @@ def extract_from_pdf(pdf_file):
     )
 
 
+# Bill date shapes -> the one strptime format that can parse them (ISO first)
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_DATE_FORMATS = (
+    (re.compile(r"\d{4}-\d{1,2}-\d{1,2}"), "%Y-%m-%d"),
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{4}"), "%m/%d/%Y"),
+    (re.compile(r"\d{1,2}/\d{1,2}/\d{2}"), "%m/%d/%y"),
+    (re.compile(r"\d{4}/\d{1,2}/\d{1,2}"), "%Y/%m/%d"),
+)
+
+
+def _parse_bill_date(date_str):
+    """
+    Parse an extracted date, sniffing its shape instead of trying formats in turn
+    
+    Returns:
+        tuple: (datetime, format used) or (None, None) if unparseable
+    """
+    try:
+        if _ISO_DATE_RE.fullmatch(date_str):
+            return datetime.fromisoformat(date_str), "%Y-%m-%d"
+        for pattern, fmt in _DATE_FORMATS:
+            if pattern.fullmatch(date_str):
+                return datetime.strptime(date_str, fmt), fmt
+    except ValueError:
+        pass  # right shape, impossible date (e.g. 2024-02-30)
+    return None, None
+
+
 def _process_extracted_data(data, extraction_cost, extraction_method):
     """
     Common processing logic for extracted data (from text or PDF)
@@ -197,6 +536,8 @@ def _process_extracted_data(data, extraction_cost, extraction_method):
     Returns:
         dict: Processed and validated data
     """
+    now = datetime.now()
+    
     # === UNIT CONVERSION ===
     usage_unit = data.get("usage_unit", "").upper()
     total_usage = data.get("total_usage")
@@ -223,26 +564,15 @@ def _process_extracted_data(data, extraction_cost, extraction_method):
     for date_field in ["service_start_date", "service_end_date"]:
         date_str = data.get(date_field)
         if date_str:
-            try:
-                parsed_date = datetime.strptime(date_str, "%Y-%m-%d")
-                current_year = datetime.now().year
-                if parsed_date.year > current_year or parsed_date.year < 1990:
+            parsed_date, fmt = _parse_bill_date(date_str)
+            if parsed_date is None:
+                data[f"{date_field}_warning"] = f"Could not parse date: {date_str}"
+            elif fmt == "%Y-%m-%d":
+                if parsed_date.year > now.year or parsed_date.year < 1990:
                     data[f"{date_field}_warning"] = f"Unusual year: {parsed_date.year}"
-            except ValueError:
-                alternative_formats = ["%m/%d/%Y", "%m/%d/%y", "%Y/%m/%d"]
-                parsed = False
-                for fmt in alternative_formats:
-                    try:
-                        parsed_date = datetime.strptime(date_str, fmt)
-                        data[date_field] = parsed_date.strftime("%Y-%m-%d")
-                        data[f"{date_field}_converted"] = True
-                        parsed = True
-                        break
-                    except ValueError:
-                        continue
-                
-                if not parsed:
-                    data[f"{date_field}_warning"] = f"Could not parse date: {date_str}"
+            else:
+                data[date_field] = parsed_date.strftime("%Y-%m-%d")
+                data[f"{date_field}_converted"] = True
     
     # === SANITY CHECK ON RATE ===
     total_cost = data.get("total_cost")
@@ -260,7 +590,7 @@ def _process_extracted_data(data, extraction_cost, extraction_method):
     
     # === ADD METADATA ===
     data['extraction_cost'] = extraction_cost
-    data['extraction_timestamp'] = datetime.now().isoformat()
+    data['extraction_timestamp'] = now.isoformat()
     data['extraction_method'] = extraction_method
     data['validation_passed'] = "rate_warning" not in data and all(
         f"{field}_warning" not in data 
@@ -270,6 +600,74 @@ def _process_extracted_data(data, extraction_cost, extraction_method):
     return data
 
 
+@dataclass(slots=True, frozen=True)
+class ExtractionSummary:
+    """
+    Minimal, flat view of an extraction + emissions result
+    
+    Holds only the fields the persistent UI and report generation read, so
+    session state carries a small slotted object instead of the full nested
+    result dict (raw text, validation metadata, audit notes, ...).
+    """
+    total_kwh: float
+    total_cost: float | None
+    start: str | None
+    end: str | None
+    mtco2e: float
+    emission_factor: float
+    emission_factor_source: str
+    emission_factor_unit: str
+    calculation_formula: str
+    region: str
+    method: str
+    
+    @classmethod
+    def from_result(cls, result, region, method=None):
+        """
+        Build a summary from an extract_and_calculate_emissions-style result
+        
+        Args:
+            result: dict with 'extraction' and 'emissions' entries
+            region: EPA region used for the calculation
+            method: Display label (defaults to the extraction method)
+            
+        Returns:
+            ExtractionSummary
+        """
+        extraction = result['extraction']
+        emissions = result['emissions']
+        audit = emissions['audit']
+        return cls(
+            total_kwh=extraction['total_kwh'],
+            total_cost=extraction.get('total_cost'),
+            start=extraction.get('service_start_date'),
+            end=extraction.get('service_end_date'),
+            mtco2e=emissions['data']['emissions_mtco2e'],
+            emission_factor=audit['emission_factor'],
+            emission_factor_source=audit['emission_factor_source'],
+            emission_factor_unit=audit['emission_factor_unit'],
+            calculation_formula=audit['calculation_formula'],
+            region=region,
+            method=method or extraction.get('extraction_method', 'Unknown')
+        )
+    
+    def to_report_input(self):
+        """Emissions data in the shape generate_gri_report_section expects"""
+        return {
+            "reporting_period": f"{self.start or 'N/A'} to {self.end or 'N/A'}",
+            "service_start_date": self.start,
+            "service_end_date": self.end,
+            "total_kwh": self.total_kwh,
+            "region": self.region,
+            "metric_tons_co2": self.mtco2e,
+            "emission_factor_used": self.emission_factor,
+            "emission_factor_source": self.emission_factor_source,
+            "emission_factor_unit": self.emission_factor_unit,
+            "gwp_source": "IPCC AR5",
+            "calculation_method": self.calculation_formula
+        }
+
+
 def extract_and_calculate_emissions(bill_text=None, pdf_file=None, region="US_AVERAGE"):
     """
     Extract data from bill (text or PDF) and calculate emissions
@@ -0,0 +1,228 @@
+"""
+Concurrent batch extraction with asyncio
+
+Same 3-tier strategy as src/extract.py, scheduled for many bills at once:
+- Tier 1/2: Docling + Tesseract are blocking local calls - run via asyncio.to_thread
+- Tier 3: Claude Vision is a ~1s HTTPS round-trip - awaited on AsyncAnthropic (httpx),
+  so 100+ bills can wait on the API concurrently without a thread each. A bill
+  starts its call as soon as its own local tiers give up.
+- Bulk Tier 3 (use_batch_api=True, for offline callers): when BATCH_API_MIN_BILLS
+  or more bills need Claude, they are sent as one Message Batches job instead
+  (half price, but the job can take minutes - not for the interactive UI)
+
+Results are yielded as each bill finishes (asyncio.as_completed) so the UI can
+update progress while slower bills are still in flight.
+"""
+import asyncio
+import hashlib
+from src.utils import (
+    extract_bill_data,
+    extract_from_pdf_with_ai_async,
+    finalize_ai_result,
+    get_async_claude_client,
+)
+from src.extract import finalize_hybrid_result, load_cached_extraction, save_cached_extraction
+from src.extract_batch_claude import BATCH_API_MIN_BILLS, submit_batch
+
+# Cap on bills being processed at once (bounds Docling worker threads and API concurrency)
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+async def _extract_local(pdf_bytes, confidence_threshold, enable_ocr):
+    """Run the local tiers in a worker thread - Tier 3 is left to the caller"""
+    return await asyncio.to_thread(
+        extract_bill_data,
+        pdf_bytes,
+        confidence_threshold=confidence_threshold,
+        enable_ocr=enable_ocr,
+        enable_ai=False
+    )
+
+
+def _merge_ai_result(result, ai_result, enable_ocr=True):
+    """Combine a below-threshold local result with the Tier 3 outcome"""
+    total_cost = result.get("total_cost", 0) + ai_result.get("cost", 0)
+
+    if ai_result.get("success"):
+        return finalize_ai_result(ai_result, total_cost, enable_ocr)
+
+    print(f"✗ Claude Vision failed: {ai_result.get('error', 'Unknown error')}")
+    result['total_cost'] = total_cost
+    result['tiers_used'] = ['Docling', 'OCR', 'Claude Vision'] if enable_ocr else ['Docling', 'Claude Vision']
+    return result
+
+
+async def extract_from_pdf_hybrid_async(pdf_bytes, confidence_threshold=0.85, enable_ocr=True, client=None):
+    """
+    Async 3-tier PDF extraction: Docling → OCR (in a worker thread) → Claude API (async)
+
+    Args:
+        pdf_bytes: Raw PDF bytes
+        confidence_threshold: Minimum confidence to accept result (default: 0.85)
+        enable_ocr: Whether to use OCR tier (default: True)
+        client: Shared anthropic.AsyncAnthropic (None disables the Claude fallback)
+
+    Returns:
+        dict: Processed extraction data with metadata, or None if failed
+    """
+    result = await _extract_local(pdf_bytes, confidence_threshold, enable_ocr)
+
+    if result.get("all_tiers_failed") and client is not None:
+        print("🤖 Local tiers below threshold - awaiting Claude Vision...")
+        ai_result = await extract_from_pdf_with_ai_async(pdf_bytes, client)
+        result = _merge_ai_result(result, ai_result, enable_ocr)
+
+    return finalize_hybrid_result(result)
+
+
+async def iter_extractions(
+    pdf_bytes_list, confidence_threshold=0.85, max_concurrency=DEFAULT_MAX_CONCURRENCY, use_batch_api=False
+):
+    """
+    Extract many bills concurrently, yielding each one as soon as it finishes
+
+    Identical uploads (same bytes) are extracted once; the copies are
+    yielded right after the original with extraction_cost 0. Cached bills
+    (see extract_from_pdf_cached) are yielded first without touching
+    Docling or the API. Local tiers then run for every remaining bill, and
+    each one they cannot handle starts its async Claude Vision call right
+    away. With use_batch_api, those bills are held until the local tiers
+    finish and, if BATCH_API_MIN_BILLS or more, sent as one Message Batches
+    job. Successful new extractions are cached.
+
+    Args:
+        pdf_bytes_list: List of raw PDF bytes
+        confidence_threshold: Minimum confidence to accept result
+        max_concurrency: Maximum bills in flight at once
+        use_batch_api: Send bulk Tier 3 through the Message Batches API
+            (half price, minutes of latency - offline use only)
+
+    Yields:
+        tuple: (index into pdf_bytes_list, extracted dict or None)
+    """
+    first_index_by_digest = {}
+    duplicates = {}  # first index -> later indices with the same bytes
+    for index, pdf_bytes in enumerate(pdf_bytes_list):
+        digest = hashlib.blake2b(pdf_bytes, digest_size=16).digest()
+        if digest in first_index_by_digest:
+            duplicates.setdefault(first_index_by_digest[digest], []).append(index)
+        else:
+            first_index_by_digest[digest] = index
+
+    if duplicates:
+        print(f"♻️ {sum(map(len, duplicates.values()))} duplicate upload(s) - extracting each distinct PDF once")
+
+    async for index, extracted in _iter_distinct_extractions(
+        pdf_bytes_list, list(first_index_by_digest.values()), confidence_threshold, max_concurrency, use_batch_api
+    ):
+        yield index, extracted
+        for duplicate_index in duplicates.get(index, ()):
+            yield duplicate_index, dict(extracted, extraction_cost=0.0, cache_hit=True) if extracted else None
+
+
+async def _iter_distinct_extractions(pdf_bytes_list, indices, confidence_threshold, max_concurrency, use_batch_api):
+    """iter_extractions for the given (deduplicated) indices into pdf_bytes_list"""
+    pending = []
+    for index in indices:
+        pdf_bytes = pdf_bytes_list[index]
+        cached = load_cached_extraction(pdf_bytes, confidence_threshold)
+        if cached:
+            yield index, cached
+        else:
+            pending.append(index)
+
+    if not pending:
+        return
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    def finish(index, result):
+        extracted = finalize_hybrid_result(result) if result else None
+        save_cached_extraction(pdf_bytes_list[index], confidence_threshold, extracted)
+        return extracted
+
+    clients = {}
+
+    def claude_client():
+        """Shared AsyncAnthropic, created for the first bill that needs Claude (None without a key)"""
+        if "claude" not in clients:
+            try:
+                clients["claude"] = get_async_claude_client()
+            except ValueError as e:
+                print(f"⚠️ {e} - Claude Vision fallback disabled for this batch")
+                clients["claude"] = None
+        return clients["claude"]
+
+    async def run_ai(index, result):
+        async with semaphore:
+            client = claude_client()
+            if client is None:
+                return index, result
+            ai_result = await extract_from_pdf_with_ai_async(pdf_bytes_list[index], client)
+            return index, _merge_ai_result(result, ai_result)
+
+    # Local tiers in worker threads; a bill they cannot handle goes straight on to Claude
+    async def run_local(index):
+        async with semaphore:
+            try:
+                result = await _extract_local(pdf_bytes_list[index], confidence_threshold, True)
+            except Exception as e:
+                print(f"❌ Extraction failed for bill {index + 1}: {e}")
+                return index, None
+        if result.get("all_tiers_failed") and not use_batch_api:
+            return await run_ai(index, result)
+        return index, result
+
+    try:
+        tier3_candidates = []
+        for next_done in asyncio.as_completed([run_local(index) for index in pending]):
+            index, result = await next_done
+            if use_batch_api and result is not None and result.get("all_tiers_failed"):
+                tier3_candidates.append((index, result))
+            else:
+                yield index, finish(index, result)
+
+        # === BULK TIER 3: ONE MESSAGE BATCHES JOB (use_batch_api only) ===
+        if len(tier3_candidates) >= BATCH_API_MIN_BILLS:
+            print(f"📦 {len(tier3_candidates)} bills need Claude Vision - using the Message Batches API")
+            ai_results = await asyncio.to_thread(
+                submit_batch, [pdf_bytes_list[index] for index, _ in tier3_candidates]
+            )
+            for (index, result), ai_result in zip(tier3_candidates, ai_results):
+                yield index, finish(index, _merge_ai_result(result, ai_result))
+            return
+
+        for next_done in asyncio.as_completed([run_ai(index, result) for index, result in tier3_candidates]):
+            index, result = await next_done
+            yield index, finish(index, result)
+    finally:
+        if clients.get("claude") is not None:
+            await clients["claude"].close()
+
+
+def run_batch_extraction(
+    pdf_bytes_list, on_result, confidence_threshold=0.85, max_concurrency=DEFAULT_MAX_CONCURRENCY, use_batch_api=False
+):
+    """
+    Blocking entry point for the Streamlit batch mode
+
+    Drives iter_extractions on a fresh event loop and calls
+    on_result(index, extracted, completed) as each bill finishes, so progress
+    bars can be updated from the script thread.
+
+    Args:
+        pdf_bytes_list: List of raw PDF bytes
+        on_result: Callback receiving (index, extracted dict or None, bills completed so far)
+        confidence_threshold: Minimum confidence to accept result
+        max_concurrency: Maximum bills in flight at once
+        use_batch_api: Send bulk Tier 3 through the Message Batches API (see iter_extractions)
+    """
+    async def consume():
+        completed = 0
+        async for index, extracted in iter_extractions(
+            pdf_bytes_list, confidence_threshold, max_concurrency, use_batch_api
+        ):
+            completed += 1
+            on_result(index, extracted, completed)
+
+    asyncio.run(consume())
@@ -0,0 +1,56 @@
+"""
+Bulk Tier 3 extraction through the Anthropic Message Batches API
+
+When many bills in one upload fall through Docling and OCR, sending them as a
+single message batch replaces N blocking ~1s round-trips with one job and is
+billed at half price (see BATCH_API_DISCOUNT in src/utils.py).
+
+The job has a polling floor, so small sets are cheaper in wall-clock time as
+individual calls - callers should only batch BATCH_API_MIN_BILLS or more, and
+only off the interactive path (a job can take minutes).
+"""
+import base64
+from src.utils import build_pdf_vision_request, parse_pdf_vision_response, run_message_batch
+
+# Below this many Tier 3 bills, per-bill calls finish sooner than a batch job
+BATCH_API_MIN_BILLS = 5
+
+
+def submit_batch(pdfs, poll_interval=5.0, timeout=1800):
+    """
+    Extract several PDFs with Claude Vision in one message batch
+
+    Args:
+        pdfs: List of raw PDF bytes
+        poll_interval: Seconds between batch status checks
+        timeout: Seconds to wait before the batch is cancelled and every PDF fails
+
+    Returns:
+        list: One extraction result dict per PDF, in input order
+              (same shape as extract_from_pdf_with_ai)
+    """
+    requests = {
+        f"bill-{index}": build_pdf_vision_request(base64.b64encode(pdf_bytes).decode('utf-8'))
+        for index, pdf_bytes in enumerate(pdfs)
+    }
+
+    try:
+        messages = run_message_batch(requests, poll_interval=poll_interval, timeout=timeout)
+    except Exception as e:
+        print(f"❌ Message batch failed: {e}")
+        return [
+            {"success": False, "error": f"Batch extraction failed: {str(e)}", "cost": 0}
+            for _ in pdfs
+        ]
+
+    results = []
+    for custom_id, message in messages.items():
+        if message is None:
+            results.append({"success": False, "error": "Batch request errored or expired", "cost": 0})
+            continue
+        try:
+            results.append(parse_pdf_vision_response(message, batch=True))
+        except Exception as e:
+            results.append({"success": False, "error": f"AI extraction failed: {str(e)}", "cost": 0})
+
+    return results
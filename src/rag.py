@@ -1,6 +1,8 @@
 # RAG system for standards
 """RAG system for querying ESG standards"""
 import os
+import threading
+from functools import lru_cache
 import chromadb
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -15,6 +17,10 @@ class ESGStandardsRAG:
     def __init__(self, standards_dir="data/esg_standards"):
         self.standards_dir = standards_dir
         self.vectorstore = None
+        self.embeddings = None
+        self._vectorstore_lock = threading.Lock()
+        # Per-instance memo of question -> embedding (tuple, so it can't be mutated by callers)
+        self._embed_cached = lru_cache(maxsize=1024)(self._embed)
         self.llm = ChatAnthropic(
             model="claude-sonnet-4-5-20250929",
             anthropic_api_key=os.getenv("ANTHROPIC_API_KEY")
@@ -42,6 +48,7 @@ class ESGStandardsRAG:
             model_name="sentence-transformers/all-MiniLM-L6-v2",
             model_kwargs={'device': 'cpu'}
         )
+        self.embeddings = embeddings
 
         # 2. FORCE disk connection with a PersistentClient
         # This is the secret sauce for making sure the folder isn't empty
@@ -78,12 +85,33 @@ class ESGStandardsRAG:
             new_count = len(self.vectorstore.get()['ids'])
             print(f"--- Success! {new_count} chunks committed to disk. ---")
         
-    def query(self, question):
-            """Query the ESG standards and get answer"""
+    def _ensure_vectorstore(self):
+        """Create the vector store once, even if a warmup thread races the first query"""
+        if self.vectorstore:
+            return
+        with self._vectorstore_lock:
             if not self.vectorstore:
                 self.create_vectorstore()
+
+    def warmup(self):
+        """Load the embedding model and open the index without calling the LLM"""
+        self._ensure_vectorstore()
+        self.vectorstore.similarity_search_by_vector(list(self.embed_query("Scope 2 emissions")), k=1)
+
+    def _embed(self, text):
+        return tuple(self.embeddings.embed_query(text))
+
+    def embed_query(self, text):
+        """Embed text with the same model the vector store uses (memoized per string)"""
+        self._ensure_vectorstore()
+        return self._embed_cached(text)
+
+    def query(self, question):
+            """Query the ESG standards and get answer"""
+            self._ensure_vectorstore()
             
-            relevant_docs = self.vectorstore.similarity_search(question, k=3)
+            # Reuse the memoized embedding - the semantic cache lookup usually just computed it
+            relevant_docs = self.vectorstore.similarity_search_by_vector(list(self.embed_query(question)), k=3)
             context = "\n\n".join([doc.page_content for doc in relevant_docs])
             
             prompt = f"""Based on the following ESG standards documentation, answer this question:
@@ -106,7 +134,7 @@ class ESGStandardsRAG:
             
             return {
                 "answer": answer,
-                "sources": list(set([doc.metadata.get('source', 'Unknown') for doc in relevant_docs]))
+                "sources": list(dict.fromkeys(doc.metadata.get('source', 'Unknown') for doc in relevant_docs))  # dedupe, keep retrieval order
             }
 
 
@@ -0,0 +1,103 @@
+"""Semantic answer cache for near-duplicate questions (random-projection LSH)"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SemanticCache:
+    """
+    Reuse answers for paraphrased questions ("What is Scope 2?" vs
+    "Explain scope two emissions") by embedding similarity.
+
+    Each table hashes a unit embedding to the sign pattern of n_bits random
+    hyperplanes, so similar vectors land in the same bucket. One long
+    signature would split most true paraphrases (at cosine 0.95 each bit
+    agrees ~90% of the time), so several short tables are probed instead
+    and candidates are confirmed with an exact cosine check.
+    """
+
+    def __init__(self, threshold=0.95, n_tables=8, n_bits=8, max_entries=1024, seed=0):
+        """
+        Args:
+            threshold: Minimum cosine similarity to reuse an answer
+            n_tables: Independent hash tables (more = higher recall)
+            n_bits: Hyperplanes per table (more = smaller buckets)
+            max_entries: Oldest entries are evicted beyond this
+            seed: Seed for the random hyperplanes (stable across restarts)
+        """
+        self.threshold = threshold
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.max_entries = max_entries
+        self.seed = seed
+
+        self._planes = None  # (n_tables, n_bits, dim) - sized on first insert
+        self._tables = [dict() for _ in range(n_tables)]  # bucket key -> set of entry ids
+        self._entries = OrderedDict()  # entry id -> (unit vector, bucket keys, value)
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _unit(self, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _keys(self, vector):
+        if self._planes is None:
+            rng = np.random.default_rng(self.seed)
+            self._planes = rng.standard_normal((self.n_tables, self.n_bits, vector.shape[0])).astype(np.float32)
+        signs = (self._planes @ vector) > 0  # (n_tables, n_bits)
+        return [np.packbits(row).tobytes() for row in signs]
+
+    def lookup(self, embedding):
+        """
+        Return the stored value for the most similar question, if any
+
+        Args:
+            embedding: Query embedding (same model used for insert)
+
+        Returns:
+            Stored value if a cached question has cosine >= threshold, else None
+        """
+        vector = self._unit(embedding)
+        with self._lock:
+            if self._planes is None:
+                return None
+
+            candidates = set()
+            for table, key in zip(self._tables, self._keys(vector)):
+                candidates.update(table.get(key, ()))
+
+            best_value, best_score = None, self.threshold
+            for entry_id in candidates:
+                stored, _, value = self._entries[entry_id]
+                score = float(stored @ vector)
+                if score >= best_score:
+                    best_value, best_score = value, score
+            return best_value
+
+    def insert(self, embedding, value):
+        """Store a value under a question embedding"""
+        vector = self._unit(embedding)
+        with self._lock:
+            keys = self._keys(vector)
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._entries[entry_id] = (vector, keys, value)
+            for table, key in zip(self._tables, keys):
+                table.setdefault(key, set()).add(entry_id)
+
+            # Evict oldest entries beyond the cap
+            while len(self._entries) > self.max_entries:
+                old_id, (_, old_keys, _) = self._entries.popitem(last=False)
+                for table, key in zip(self._tables, old_keys):
+                    bucket = table.get(key)
+                    if bucket is not None:
+                        bucket.discard(old_id)
+                        if not bucket:
+                            del table[key]
+
+    def __len__(self):
+        return len(self._entries)
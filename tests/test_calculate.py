@@ -0,0 +1,67 @@
+"""Emissions calculators: vectorized batch paths agree with the single-bill functions"""
+import pytest
+
+from src.calculate import (
+    batch_calculate_emissions,
+    calculate_electricity_emissions,
+    calculate_electricity_emissions_batch,
+    load_epa_factors,
+)
+
+CALCULATION_DATE = "2025-01-01T00:00:00"
+KWH_VALUES = [0, 1, 850, 920.5, 1234.567, 99999.99]
+
+
+@pytest.mark.parametrize("region", ["US_AVERAGE", "ARKANSAS", "TEXAS"])
+def test_electricity_batch_matches_single(region):
+    periods = [None, "December 2024", None, "Q1 2025", None, None]
+
+    batch = calculate_electricity_emissions_batch(
+        KWH_VALUES, region, reporting_periods=periods, calculation_date=CALCULATION_DATE
+    )
+    single = [
+        calculate_electricity_emissions(kwh, region, reporting_period=period, calculation_date=CALCULATION_DATE)
+        for kwh, period in zip(KWH_VALUES, periods)
+    ]
+
+    assert batch == single
+
+
+def test_electricity_batch_matches_single_without_audit():
+    batch = calculate_electricity_emissions_batch(KWH_VALUES, "ARKANSAS", include_audit=False)
+    single = [calculate_electricity_emissions(kwh, "ARKANSAS", include_audit=False) for kwh in KWH_VALUES]
+
+    assert batch == single
+
+
+def test_electricity_batch_rejects_bad_input():
+    with pytest.raises(ValueError, match="negative"):
+        calculate_electricity_emissions_batch([100, -1], "ARKANSAS")
+    with pytest.raises(ValueError, match="not found"):
+        calculate_electricity_emissions_batch([100], "ATLANTIS")
+
+
+def test_batch_calculate_emissions_summary_only_matches_full():
+    activities = [
+        {"type": "electricity", "value": 850, "region": "ARKANSAS"},
+        {"type": "natural_gas", "value": 45},
+        {"type": "electricity", "value": "850"},
+        {"type": "electricity", "value": 920, "region": "TEXAS"},
+        {"type": "water", "value": 10},
+        {"type": "electricity", "value": 1200},
+    ]
+
+    results, summary = batch_calculate_emissions(activities)
+    lean_results, lean_summary = batch_calculate_emissions(activities, return_full=False)
+
+    assert [r["data"]["input_value"] for r in results] == [850, 45, 920, 1200]  # input order
+    assert [e["activity_index"] for e in summary["errors"]] == [2, 4]
+    assert lean_results == []
+    assert lean_summary == summary
+
+
+def test_load_epa_factors_returns_a_private_copy():
+    factors = load_epa_factors()
+    factors["version"] = "edited"
+
+    assert load_epa_factors()["version"] != "edited"
@@ -0,0 +1,56 @@
+"""Scope categorization: one Message Batches job for many activities"""
+from types import SimpleNamespace
+
+import src.categorize as categorize
+from src.utils import calculate_claude_cost
+
+
+def scope_message(text):
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=text)],
+        usage=SimpleNamespace(input_tokens=300, output_tokens=40),
+    )
+
+
+def test_categorize_batch_keeps_input_order(monkeypatch):
+    submitted = {}
+    replies = {
+        "act-0": scope_message('```json\n{"scope": "Scope 2", "reasoning": "Purchased electricity"}\n```'),
+        "act-2": None,
+        "act-3": scope_message('{"scope": "Scope 9", "reasoning": "?"}'),
+    }
+
+    def fake_run_message_batch(requests, **kwargs):
+        submitted.update(requests)
+        return {custom_id: replies[custom_id] for custom_id in requests}
+
+    monkeypatch.setattr(categorize, "run_message_batch", fake_run_message_batch)
+
+    results = categorize.categorize_batch(["Office electricity", "  ", "Fleet diesel", "Mystery"])
+
+    assert list(submitted) == ["act-0", "act-2", "act-3"]  # blank activity is not sent
+    assert submitted["act-0"]["model"] == categorize.CATEGORIZE_MODEL
+    assert results[0]["scope"] == "Scope 2"
+    assert results[0]["categorization_cost"] == calculate_claude_cost(300, 40, batch=True, model=categorize.CATEGORIZE_MODEL)
+    assert results[1] == {"scope": "Unknown", "reasoning": "No activity description provided", "categorization_cost": 0}
+    assert results[2]["scope"] == "Unknown" and results[2]["reasoning"] == "Batch request errored or expired"
+    assert results[3]["scope"] == "Unknown"  # invalid scope label
+
+
+def test_categorize_batch_failure_marks_every_activity_unknown(monkeypatch):
+    def fail(requests, **kwargs):
+        raise TimeoutError("too slow")
+    monkeypatch.setattr(categorize, "run_message_batch", fail)
+
+    results = categorize.categorize_batch(["Office electricity", "Fleet diesel"])
+
+    assert [r["scope"] for r in results] == ["Unknown", "Unknown"]
+    assert [r["categorization_cost"] for r in results] == [0, 0]
+
+
+def test_categorize_batch_without_activities_skips_the_api(monkeypatch):
+    def fail(requests, **kwargs):
+        raise AssertionError("no batch should be submitted")
+    monkeypatch.setattr(categorize, "run_message_batch", fail)
+
+    assert [r["scope"] for r in categorize.categorize_batch(["", None])] == ["Unknown", "Unknown"]
@@ -0,0 +1,166 @@
+"""Concurrent batch extraction: duplicate uploads, Claude Vision fallback and the on-disk cache"""
+from functools import partial
+
+import asyncio
+
+import pytest
+
+import src.extract as extract
+import src.extract_async as extract_async
+
+
+def local_result(kwh):
+    """A confident Docling result as extract_bill_data would return it"""
+    return {
+        "success": True,
+        "data": {
+            "account_number": "123", "total_usage": kwh, "usage_unit": "kWh", "total_cost": kwh * 0.15,
+            "service_start_date": "2024-12-01", "service_end_date": "2024-12-31",
+        },
+        "confidence": 1.0,
+        "method": "Docling (fast, no-OCR)",
+        "tiers_used": ["Docling (fast)"],
+        "total_cost": 0.0,
+    }
+
+
+@pytest.fixture
+def local_calls(monkeypatch, tmp_path):
+    """Fake local tiers (PDF bytes are the kWh as text) and a per-test cache dir"""
+    calls = []
+
+    async def fake_extract_local(pdf_bytes, confidence_threshold, enable_ocr):
+        calls.append(pdf_bytes)
+        if pdf_bytes == b"broken":
+            raise RuntimeError("unreadable PDF")
+        if pdf_bytes == b"scanned":
+            return {"success": False, "all_tiers_failed": True, "total_cost": 0.0}
+        return local_result(float(pdf_bytes))
+
+    monkeypatch.setattr(extract_async, "_extract_local", fake_extract_local)
+    monkeypatch.setattr(extract_async, "load_cached_extraction", partial(extract.load_cached_extraction, cache_dir=tmp_path))
+    monkeypatch.setattr(extract_async, "save_cached_extraction", partial(extract.save_cached_extraction, cache_dir=tmp_path))
+    return calls
+
+
+@pytest.fixture
+def claude_calls(monkeypatch):
+    """Fake async Claude Vision that reads 400 kWh from every PDF it is sent"""
+    calls = []
+
+    class FakeAsyncClient:
+        async def close(self):
+            calls.append("closed")
+
+    async def fake_extract_with_ai(pdf_bytes, client):
+        calls.append(pdf_bytes)
+        ai_result = local_result(400.0)
+        ai_result.update(method="AI-powered (Claude PDF vision)", cost=0.02)
+        return ai_result
+
+    monkeypatch.setattr(extract_async, "get_async_claude_client", FakeAsyncClient)
+    monkeypatch.setattr(extract_async, "extract_from_pdf_with_ai_async", fake_extract_with_ai)
+    return calls
+
+
+def run(pdf_bytes_list, **kwargs):
+    results = {}
+    extract_async.run_batch_extraction(
+        pdf_bytes_list, lambda index, extracted, completed: results.update({index: extracted}), **kwargs
+    )
+    return results
+
+
+def test_duplicate_uploads_are_extracted_once(local_calls):
+    results = run([b"850", b"920", b"850", b"850"])
+
+    assert sorted(local_calls) == [b"850", b"920"]
+    assert sorted(results) == [0, 1, 2, 3]
+    assert [results[i]["total_kwh"] for i in range(4)] == [850, 920, 850, 850]
+    for copy in (results[2], results[3]):
+        assert copy["cache_hit"] is True
+        assert copy["extraction_cost"] == 0.0
+    assert not results[0].get("cache_hit")
+
+
+def test_failed_extraction_is_reported_for_every_copy(local_calls):
+    results = run([b"broken", b"850", b"broken"])
+
+    assert local_calls.count(b"broken") == 1
+    assert results[0] is None and results[2] is None
+    assert results[1]["total_kwh"] == 850
+
+
+def test_second_run_is_served_from_cache(local_calls):
+    run([b"850", b"920"])
+    local_calls.clear()
+
+    results = run([b"920", b"850", b"broken"])
+
+    assert local_calls == [b"broken"]  # failures are not cached
+    assert results[0]["cache_hit"] is True and results[0]["total_kwh"] == 920
+    assert results[1]["cache_hit"] is True and results[1]["extraction_cost"] == 0.0
+    assert results[2] is None
+
+
+def test_low_confidence_bills_fall_back_to_claude(local_calls, claude_calls):
+    results = run([b"850", b"scanned"])
+
+    assert claude_calls == [b"scanned", "closed"]
+    assert results[0]["total_kwh"] == 850 and results[0]["extraction_cost"] == 0.0
+    assert results[1]["total_kwh"] == 400
+    assert results[1]["extraction_cost"] == 0.02
+    assert results[1]["tier"] == "claude"
+
+
+def test_claude_starts_before_slower_local_bills_finish(monkeypatch, local_calls, claude_calls):
+    claude_started = asyncio.Event()
+    fake_extract_with_ai = extract_async.extract_from_pdf_with_ai_async
+
+    async def signalling_extract_with_ai(pdf_bytes, client):
+        claude_started.set()
+        return await fake_extract_with_ai(pdf_bytes, client)
+
+    fake_extract_local = extract_async._extract_local
+
+    async def slow_extract_local(pdf_bytes, confidence_threshold, enable_ocr):
+        if pdf_bytes == b"850":
+            await asyncio.wait_for(claude_started.wait(), timeout=5)
+        return await fake_extract_local(pdf_bytes, confidence_threshold, enable_ocr)
+
+    monkeypatch.setattr(extract_async, "extract_from_pdf_with_ai_async", signalling_extract_with_ai)
+    monkeypatch.setattr(extract_async, "_extract_local", slow_extract_local)
+
+    results = run([b"850", b"scanned"])
+
+    assert results[0]["total_kwh"] == 850
+    assert results[1]["tier"] == "claude"
+
+
+def test_bulk_tier3_uses_one_message_batch_only_when_asked(monkeypatch, local_calls, claude_calls):
+    batches = []
+
+    def fake_submit_batch(pdfs):
+        batches.append(pdfs)
+        ai_result = local_result(400.0)
+        ai_result.update(method="AI-powered (Claude PDF vision)", cost=0.01)
+        return [dict(ai_result) for _ in pdfs]
+
+    monkeypatch.setattr(extract_async, "submit_batch", fake_submit_batch)
+    scanned = [b"scanned-%d" % i for i in range(extract_async.BATCH_API_MIN_BILLS)]
+    monkeypatch.setattr(
+        extract_async, "_extract_local",
+        lambda pdf_bytes, *args: asyncio.sleep(0, {"success": False, "all_tiers_failed": True, "total_cost": 0.0}),
+    )
+
+    results = run(scanned, use_batch_api=True)
+
+    assert [sorted(pdfs) for pdfs in batches] == [scanned]  # in local completion order
+    assert claude_calls == []  # no per-bill calls, no async client
+    assert [results[i]["extraction_cost"] for i in range(len(scanned))] == [0.01] * len(scanned)
+
+    run([b"scanned-a", b"scanned-b"], use_batch_api=True)  # below BATCH_API_MIN_BILLS
+
+    assert len(batches) == 1
+    assert sorted(claude_calls[:2]) == [b"scanned-a", b"scanned-b"]
+    assert claude_calls[2:] == ["closed"]
@@ -0,0 +1,95 @@
+"""Message Batches API: polling, per-request failures and bulk Tier 3 results"""
+from types import SimpleNamespace
+
+import pytest
+
+import src.extract_batch_claude as extract_batch_claude
+import src.utils as utils
+
+
+def vision_message(text, input_tokens=1000, output_tokens=100):
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=text)],
+        usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=output_tokens),
+    )
+
+
+class FakeBatches:
+    """messages.batches that ends after `polls` retrieves; custom_ids in `errored` fail"""
+
+    def __init__(self, polls=1, errored=()):
+        self.polls = polls
+        self.errored = set(errored)
+        self.submitted = None
+        self.cancelled = []
+
+    def create(self, requests):
+        self.submitted = requests
+        return SimpleNamespace(id="batch-1", processing_status="in_progress")
+
+    def retrieve(self, batch_id):
+        self.polls -= 1
+        return SimpleNamespace(id=batch_id, processing_status="ended" if self.polls <= 0 else "in_progress")
+
+    def cancel(self, batch_id):
+        self.cancelled.append(batch_id)
+
+    def results(self, batch_id):
+        # Results come back in completion order, not submission order
+        for request in reversed(self.submitted):
+            custom_id = request["custom_id"]
+            if custom_id in self.errored:
+                yield SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="errored"))
+            else:
+                message = vision_message(f'{{"id": "{custom_id}"}}')
+                yield SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type="succeeded", message=message))
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    fake = FakeBatches(polls=2, errored={"b"})
+    client = SimpleNamespace(messages=SimpleNamespace(batches=fake))
+    monkeypatch.setattr(utils, "get_claude_client", lambda: client)
+    return fake
+
+
+def test_run_message_batch_returns_messages_in_request_order(batches):
+    messages = utils.run_message_batch({"a": {}, "b": {}, "c": {}}, poll_interval=0)
+
+    assert [request["custom_id"] for request in batches.submitted] == ["a", "b", "c"]
+    assert list(messages) == ["a", "b", "c"]
+    assert messages["a"].content[0].text == '{"id": "a"}'
+    assert messages["b"] is None  # errored request
+    assert batches.cancelled == []
+
+
+def test_run_message_batch_cancels_on_timeout(batches):
+    batches.polls = float("inf")
+
+    with pytest.raises(TimeoutError):
+        utils.run_message_batch({"a": {}}, poll_interval=0, timeout=-1)
+    assert batches.cancelled == ["batch-1"]
+
+
+def test_submit_batch_keeps_input_order_and_reports_failures(monkeypatch):
+    bill = '{"total_usage": 850, "usage_unit": "kWh", "total_cost": 127.5}'
+    replies = {"bill-0": vision_message(bill), "bill-1": None, "bill-2": vision_message("no JSON here")}
+    monkeypatch.setattr(extract_batch_claude, "run_message_batch", lambda requests, **kwargs: {k: replies[k] for k in requests})
+
+    results = extract_batch_claude.submit_batch([b"%PDF-a", b"%PDF-b", b"%PDF-c"])
+
+    assert results[0]["success"] is True and results[0]["data"]["total_usage"] == 850
+    assert results[0]["cost"] == utils.calculate_claude_cost(1000, 100, batch=True)
+    assert results[1] == {"success": False, "error": "Batch request errored or expired", "cost": 0}
+    assert results[2]["success"] is False and results[2]["cost"] > 0
+
+
+def test_submit_batch_failure_fails_every_pdf(monkeypatch):
+    def fail(requests, **kwargs):
+        raise TimeoutError("too slow")
+    monkeypatch.setattr(extract_batch_claude, "run_message_batch", fail)
+
+    results = extract_batch_claude.submit_batch([b"%PDF-a", b"%PDF-b"])
+
+    assert [r["success"] for r in results] == [False, False]
+    assert all("too slow" in r["error"] for r in results)
@@ -1 +1,216 @@
-# Basic tests
\ No newline at end of file
+"""Text extraction: regex fast path, Claude fallback, batch jobs, answer cache and date parsing"""
+import dataclasses
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import src.extract as extract
+from src.utils import calculate_claude_cost
+
+SAMPLE_BILL = Path(__file__).resolve().parent.parent / "data" / "test_bills" / "sample_electric_bill.txt"
+
+
+def numeric_period_bill():
+    """The sample bill with a service period the date regexes can read"""
+    return SAMPLE_BILL.read_text().replace("December 1 - December 31, 2024", "12/01/2024 - 12/31/2024")
+
+
+@pytest.fixture
+def no_claude(monkeypatch):
+    """Fail the test if anything reaches the Claude API"""
+    def fail(*args, **kwargs):
+        raise AssertionError("Claude should not be called")
+    monkeypatch.setattr(extract, "call_claude_with_cost", fail)
+
+
+def test_fast_path_takes_labeled_total_not_breakdown_line():
+    result = extract._extract_bill_text_locally(numeric_period_bill())
+
+    assert result is not None
+    assert result["total_kwh"] == 850  # "Total kWh: 850", not "Peak: 320 kWh"
+    assert result["total_cost"] == 127.50
+    assert result["service_start_date"] == "2024-12-01"
+    assert result["service_end_date"] == "2024-12-31"
+    assert result["extraction_method"] == "Text extraction (local regex)"
+    assert result["extraction_cost"] == 0.0
+
+
+def test_fast_path_rejects_bill_without_labeled_total():
+    text = numeric_period_bill().replace("Total kWh: 850\n", "")
+
+    assert extract._extract_bill_text_locally(text) is None
+
+
+def test_fast_path_rejects_unparsed_service_dates():
+    # Spelled-out dates are not read by the regexes - confidence stays below threshold
+    assert extract._extract_bill_text_locally(SAMPLE_BILL.read_text()) is None
+
+
+def test_fast_path_rejects_unusual_rate():
+    text = numeric_period_bill().replace("Total Amount Due: $127.50", "Total Amount Due: $9,999.00")
+
+    assert extract._extract_bill_text_locally(text) is None
+
+
+def test_confident_bill_text_skips_claude(no_claude, tmp_path):
+    result = extract.extract_utility_bill_data(numeric_period_bill(), cache_dir=tmp_path)
+
+    assert result["total_kwh"] == 850
+    assert not list(tmp_path.iterdir())  # local answers are not written to the cache
+
+
+def test_text_cache_key_includes_models(monkeypatch, tmp_path):
+    haiku_path = extract._text_extraction_cache_path("bill", tmp_path)
+    monkeypatch.setattr(extract, "BILL_EXTRACTION_MODEL", "claude-sonnet-4-20250514")
+
+    assert extract._text_extraction_cache_path("bill", tmp_path) != haiku_path
+
+
+def test_only_validated_claude_answers_are_cached(monkeypatch, tmp_path):
+    answers = {
+        "unusual rate": '{"total_usage": 800, "usage_unit": "kWh", "total_cost": 1000}',
+        "good bill": '{"total_usage": 800, "usage_unit": "kWh", "total_cost": 100}',
+    }
+    monkeypatch.setattr(
+        extract, "call_claude_with_cost",
+        lambda prompt, **kwargs: (answers[prompt.split("\n", 1)[1]], {"total_cost": 0.01})
+    )
+
+    failed = extract.extract_utility_bill_data("unusual rate", cache_dir=tmp_path)
+    assert failed["validation_passed"] is False
+    assert failed["extraction_cost"] == 0.02  # retried on the fallback model
+    assert not extract._text_extraction_cache_path("unusual rate", tmp_path).exists()
+
+    passed = extract.extract_utility_bill_data("good bill", cache_dir=tmp_path)
+    assert passed["validation_passed"] is True
+    assert passed["extraction_cost"] == 0.01
+    assert extract._text_extraction_cache_path("good bill", tmp_path).exists()
+
+
+def bill_message(text):
+    """A batch result stopped on the closing brace, as BILL_EXTRACTION_STOP_SEQUENCES asks"""
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=text.rstrip("}"))],
+        stop_sequence="}",
+        usage=SimpleNamespace(input_tokens=500, output_tokens=40),
+    )
+
+
+def test_extraction_batch_retries_invalid_answers_on_fallback_model(monkeypatch, tmp_path):
+    answers = {
+        "good bill": '{"total_usage": 800, "usage_unit": "kWh", "total_cost": 100}',
+        "unusual rate": '{"total_usage": 800, "usage_unit": "kWh", "total_cost": 1000}',
+        "lost bill": None,
+    }
+    submitted = []
+
+    def fake_run_message_batch(requests, **kwargs):
+        submitted.append({custom_id: params["model"] for custom_id, params in requests.items()})
+        texts = {custom_id: params["messages"][0]["content"].split("\n", 1)[1] for custom_id, params in requests.items()}
+        return {
+            custom_id: bill_message(answers[text]) if answers[text] else None
+            for custom_id, text in texts.items()
+        }
+
+    monkeypatch.setattr(extract, "run_message_batch", fake_run_message_batch)
+    texts = [numeric_period_bill(), "good bill", "unusual rate", "lost bill"]
+
+    results = extract.extract_utility_bill_data_batch(texts, cache_dir=tmp_path)
+
+    primary, fallback = extract._bill_extraction_models()
+    assert submitted == [
+        {"bill-1": primary, "bill-2": primary, "bill-3": primary},  # fast-path bill 0 is not sent
+        {"bill-2": fallback, "bill-3": fallback},
+    ]
+    assert results[0]["extraction_method"] == "Text extraction (local regex)"
+    assert results[1]["total_kwh"] == 800 and results[1]["validation_passed"] is True
+    assert results[1]["extraction_cost"] == calculate_claude_cost(500, 40, batch=True, model=primary)
+    assert results[2]["validation_passed"] is False
+    assert results[2]["extraction_cost"] == (
+        calculate_claude_cost(500, 40, batch=True, model=primary)
+        + calculate_claude_cost(500, 40, batch=True, model=fallback)
+    )
+    assert results[3] is None
+    assert [extract._text_extraction_cache_path(t, tmp_path).exists() for t in texts] == [False, True, False, False]
+
+
+def test_extraction_batch_serves_cached_texts_without_a_job(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        extract, "call_claude_with_cost",
+        lambda prompt, **kwargs: ('{"total_usage": 800, "usage_unit": "kWh", "total_cost": 100}', {"total_cost": 0.01})
+    )
+    extract.extract_utility_bill_data("good bill", cache_dir=tmp_path)
+
+    def fail(requests, **kwargs):
+        raise AssertionError("no batch should be submitted")
+    monkeypatch.setattr(extract, "run_message_batch", fail)
+
+    results = extract.extract_utility_bill_data_batch(["good bill", numeric_period_bill()], cache_dir=tmp_path)
+
+    assert results[0]["total_kwh"] == 800
+    assert results[1]["total_kwh"] == 850
+
+
+@pytest.mark.parametrize("date_str, expected, fmt", [
+    ("2025-01-05", (2025, 1, 5), "%Y-%m-%d"),
+    ("2025-1-5", (2025, 1, 5), "%Y-%m-%d"),
+    ("01/05/2025", (2025, 1, 5), "%m/%d/%Y"),
+    ("1/5/25", (2025, 1, 5), "%m/%d/%y"),
+    ("2025/01/05", (2025, 1, 5), "%Y/%m/%d"),
+    ("2024-02-29", (2024, 2, 29), "%Y-%m-%d"),
+])
+def test_parse_bill_date_formats(date_str, expected, fmt):
+    parsed, used_fmt = extract._parse_bill_date(date_str)
+
+    assert (parsed.year, parsed.month, parsed.day) == expected
+    assert used_fmt == fmt
+
+
+@pytest.mark.parametrize("date_str", [
+    "2024-02-30",        # right shape, impossible day
+    "2023-02-29",        # not a leap year
+    "13/40/2025",
+    "Jan 5 2025",
+    "2025-01-05T00:00",  # timestamps are not bill dates
+    "20250105",
+    " 2025-01-05",       # whole string must match
+    "",
+])
+def test_parse_bill_date_rejects(date_str):
+    assert extract._parse_bill_date(date_str) == (None, None)
+
+
+def test_process_extracted_data_normalizes_and_flags_dates():
+    data = {
+        "total_usage": 850, "usage_unit": "kWh", "total_cost": 127.5,
+        "service_start_date": "12/01/2024", "service_end_date": "2024-02-30",
+    }
+
+    result = extract._process_extracted_data(data, 0.0, "Text extraction")
+
+    assert result["service_start_date"] == "2024-12-01"
+    assert result["service_start_date_converted"] is True
+    assert result["service_end_date_warning"] == "Could not parse date: 2024-02-30"
+    assert result["validation_passed"] is False
+
+
+def test_extraction_summary_from_result_is_frozen():
+    result = {
+        "extraction": {"total_kwh": 850, "total_cost": 127.5, "service_start_date": "2024-12-01",
+                       "service_end_date": "2024-12-31", "extraction_method": "Docling (fast, no-OCR)"},
+        "emissions": {
+            "data": {"emissions_mtco2e": 0.6222},
+            "audit": {"emission_factor": 0.732, "emission_factor_source": "EPA eGRID",
+                      "emission_factor_unit": "kg_co2e_per_kwh", "calculation_formula": "850 kWh x 0.732"},
+        },
+    }
+
+    summary = extract.ExtractionSummary.from_result(result, "ARKANSAS")
+
+    assert summary.method == "Docling (fast, no-OCR)"
+    assert extract.ExtractionSummary.from_result(result, "ARKANSAS", method="Batch Processing").method == "Batch Processing"
+    assert summary.to_report_input()["reporting_period"] == "2024-12-01 to 2024-12-31"
+    assert summary.to_report_input()["metric_tons_co2"] == 0.6222
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        summary.total_kwh = 0
@@ -0,0 +1,35 @@
+"""Semantic answer cache: near-duplicate hits, threshold misses, eviction"""
+import numpy as np
+
+from src.semantic_cache import SemanticCache
+
+
+def unit(seed, dim=64):
+    vector = np.random.default_rng(seed).standard_normal(dim)
+    return vector / np.linalg.norm(vector)
+
+
+def test_paraphrase_hits_and_unrelated_misses():
+    cache = SemanticCache(threshold=0.95)
+    question = unit(1)
+    cache.insert(question, "Scope 2 answer")
+
+    paraphrase = question + 0.05 * unit(2)  # cosine ~0.999
+
+    assert cache.lookup(question) == "Scope 2 answer"
+    assert cache.lookup(paraphrase) == "Scope 2 answer"
+    assert cache.lookup(unit(3)) is None
+
+
+def test_empty_cache_misses():
+    assert SemanticCache().lookup(unit(1)) is None
+
+
+def test_oldest_entries_are_evicted():
+    cache = SemanticCache(max_entries=2)
+    for seed in (1, 2, 3):
+        cache.insert(unit(seed), seed)
+
+    assert len(cache) == 2
+    assert cache.lookup(unit(1)) is None
+    assert cache.lookup(unit(3)) == 3